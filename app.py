@@ -1,30 +1,91 @@
 from __future__ import annotations
 
+import copy
+import functools
+import hashlib
 import importlib.util
-import json
+import io
+import mmap
 import os
 import re
 import tempfile
+import threading
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
+from types import MappingProxyType
 from typing import Tuple
 
-from flask import Flask, after_this_request, jsonify, redirect, request, send_file
+import orjson
+from flask import Flask, Response, jsonify, redirect, request, send_file
+from flask.json.provider import DefaultJSONProvider
 
-from utilities import create_blank_check_pair, create_check
+from utilities import render_blank_check_pair, render_check
 import configurations
 import common_dsql
 
+try:
+    # Imported once at startup; handlers gate on _boto3_available() before use.
+    import sso
+except ModuleNotFoundError:
+    sso = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson so jsonify/request.get_json skip stdlib json."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Feed orjson's bytes straight into the response, skipping the
+        # str decode + re-encode that the default dumps-based path does.
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype="application/json")
+
+
 app = Flask(__name__, static_folder="site", static_url_path="")
+app.json = OrjsonProvider(app)
 
 os.environ.setdefault("SSO_CACHE_BACKEND", "file")
 os.environ.setdefault("DSQL_CACHE_BACKEND", "file")
 
-PAGE_SIZES = {
-    "single": (8.5, 4.0),
-    "double": (8.5, 7.5),
-    "triple": (8.5, 11.0),
-}
+PAGE_SIZES = MappingProxyType(
+    {
+        "single": (8.5, 4.0),
+        "double": (8.5, 7.5),
+        "triple": (8.5, 11.0),
+    }
+)
+_DEFAULT_PAGE_SIZE = PAGE_SIZES["triple"]
+
+# Compiled once; save_global_settings runs these on every POST.
+_RE_NON_DIGIT = re.compile(r"[^0-9]")
+_RE_REGION = re.compile(r"[a-z0-9-]+")
+_RE_ACCOUNT_ID = re.compile(r"\d{12}")
+
+_GLOBAL_SETTING_KEYS = (
+    "sso_url",
+    "sso_region",
+    "account_id",
+    "role_name",
+    "aws_region",
+    "db_name",
+    "db_user",
+    "tag_key",
+    "tag_value",
+)
+
+# field name -> (pattern, error) applied to non-empty values in one loop.
+_GLOBAL_FIELD_VALIDATORS = (
+    ("sso_region", _RE_REGION, "SSO region must look like us-west-2."),
+    ("aws_region", _RE_REGION, "AWS region must look like us-west-2."),
+    ("account_id", _RE_ACCOUNT_ID, "Account ID must be a 12-digit number."),
+)
 
 DSQL_ACCOUNT_FIELDS = (
     "bank_account_id",
@@ -43,8 +104,70 @@ DSQL_ACCOUNT_FIELDS = (
     "bank_fractional",
 )
 
+# Shared by the list and single-account fetches; only the WHERE differs.
+_DSQL_ACCOUNT_SELECT = """
+    SELECT
+        ba.bank_account_id,
+        ba.routing,
+        ba.account,
+        ba.name,
+        ba.company_name_1,
+        ba.company_name_2,
+        ba.company_address_1,
+        ba.company_address_2,
+        ba.next_check_number,
+        b.bank_name_1,
+        b.bank_name_2,
+        b.bank_address_1,
+        b.bank_address_2,
+        b.bank_fractional
+    FROM bank_accounts ba
+    LEFT JOIN banks b ON b.routing = ba.routing
+"""
+
+
+# Process pool for CPU-bound PDF rendering; built on first use so plain
+# imports of this module (and fork-based workers) stay cheap.
+_PDF_POOL = None
+_PDF_POOL_LOCK = threading.Lock()
+
+
+def _pdf_pool() -> ProcessPoolExecutor:
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is None:
+            _PDF_POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+        return _PDF_POOL
+
+
+def _render_in_pool(fn, /, *args, **kwargs):
+    """Run a render function in the PDF pool; rebuild the pool and retry once
+    if it broke (e.g. a worker was OOM-killed mid-run), since a
+    ProcessPoolExecutor marks itself broken permanently."""
+    global _PDF_POOL
+    pool = _pdf_pool()
+    try:
+        return pool.submit(fn, *args, **kwargs).result()
+    except BrokenProcessPool:
+        with _PDF_POOL_LOCK:
+            if _PDF_POOL is pool:
+                pool.shutdown(wait=False)
+                _PDF_POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+            pool = _PDF_POOL
+        return pool.submit(fn, *args, **kwargs).result()
+
+
+def _json_response(data, status: int = 200) -> Response:
+    """Serialize straight to an orjson bytes Response, bypassing jsonify."""
+    return Response(orjson.dumps(data), status=status, mimetype="application/json")
+
+
+def _sync_global_settings(settings: dict) -> bool:
+    """Mirror web global settings into the user config; returns whether cfg changed.
 
-def _sync_global_settings(settings: dict) -> None:
+    Runs as one serialized read-modify-write via mutate_cfg so concurrent
+    syncs (or other config writers) cannot drop each other's updates.
+    """
     global_settings = settings.get("global", {})
     mapping = {
         "START_URL": "sso_url",
@@ -57,15 +180,18 @@ def _sync_global_settings(settings: dict) -> None:
         "TAG_KEY": "tag_key",
         "TAG_VALUE": "tag_value",
     }
-    cfg = configurations.load_cfg()
     changed = False
-    for cfg_key, setting_key in mapping.items():
-        value = (global_settings.get(setting_key) or "").strip()
-        if value and cfg.get(cfg_key) != value:
-            cfg[cfg_key] = value
-            changed = True
-    if changed:
-        configurations.save_cfg(cfg)
+
+    def _apply(cfg: dict) -> None:
+        nonlocal changed
+        for cfg_key, setting_key in mapping.items():
+            value = (global_settings.get(setting_key) or "").strip()
+            if value and cfg.get(cfg_key) != value:
+                cfg[cfg_key] = value
+                changed = True
+
+    configurations.mutate_cfg(_apply)
+    return changed
 
 
 def _dsql_required_settings(settings: dict) -> dict:
@@ -92,18 +218,22 @@ def _resolve_start_url(settings: dict, fallback: dict) -> str:
     return settings.get("global", {}).get("sso_url") or fallback["START_URL"]
 
 
+@functools.lru_cache(maxsize=None)
 def _keyring_available() -> bool:
     return importlib.util.find_spec("keyring") is not None
 
 
+@functools.lru_cache(maxsize=None)
 def _boto3_available() -> bool:
     return importlib.util.find_spec("boto3") is not None
 
 
+@functools.lru_cache(maxsize=None)
 def _psycopg2_available() -> bool:
     return importlib.util.find_spec("psycopg2") is not None
 
 
+@functools.lru_cache(maxsize=None)
 def _dsql_service_available(region: str) -> bool:
     try:
         import boto3
@@ -115,14 +245,14 @@ def _dsql_service_available(region: str) -> bool:
         return False
 
 
+@functools.lru_cache(maxsize=1)
 def _sso_backend_requires_keyring() -> bool:
+    # The cache backend is fixed for the lifetime of the process.
     backend = os.getenv("SSO_CACHE_BACKEND", "auto").strip().lower()
     return backend == "keyring"
 
 
 def _dsql_is_authenticated(start_url: str, cfg: dict) -> bool:
-    import sso
-
     return sso.has_cached_access_token(
         start_url=start_url,
         sso_region=cfg["SSO_REGION"],
@@ -131,71 +261,31 @@ def _dsql_is_authenticated(start_url: str, cfg: dict) -> bool:
     )
 
 
-def _fetch_dsql_accounts() -> list[dict]:
-    import common_dsql
+def _fetch_dsql_accounts() -> list[tuple]:
+    from psycopg2.extensions import cursor as _tuple_cursor
 
-    with common_dsql.connect_db() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT
-                    ba.bank_account_id,
-                    ba.routing,
-                    ba.account,
-                    ba.name,
-                    ba.company_name_1,
-                    ba.company_name_2,
-                    ba.company_address_1,
-                    ba.company_address_2,
-                    ba.next_check_number,
-                    b.bank_name_1,
-                    b.bank_name_2,
-                    b.bank_address_1,
-                    b.bank_address_2,
-                    b.bank_fractional
-                FROM bank_accounts ba
-                LEFT JOIN banks b ON b.routing = ba.routing
-                ORDER BY ba.name
-                """
-            )
-            return cur.fetchall()
+    with common_dsql.get_conn() as conn:
+        # Named (server-side) cursor: rows stream over in itersize batches
+        # instead of materializing the whole table in one fetchall. Plain
+        # tuple rows: the handler ships fields + rows, not per-row dicts.
+        with conn.cursor(name="dsql_accounts", cursor_factory=_tuple_cursor) as cur:
+            cur.itersize = 500
+            cur.execute(_DSQL_ACCOUNT_SELECT + "    ORDER BY ba.name")
+            return list(cur)
 
 
 def _fetch_dsql_account(account_id: str) -> dict | None:
-    import common_dsql
-
-    with common_dsql.connect_db() as conn:
+    with common_dsql.get_conn() as conn:
         with conn.cursor() as cur:
             cur.execute(
-                """
-                SELECT
-                    ba.bank_account_id,
-                    ba.routing,
-                    ba.account,
-                    ba.name,
-                    ba.company_name_1,
-                    ba.company_name_2,
-                    ba.company_address_1,
-                    ba.company_address_2,
-                    ba.next_check_number,
-                    b.bank_name_1,
-                    b.bank_name_2,
-                    b.bank_address_1,
-                    b.bank_address_2,
-                    b.bank_fractional
-                FROM bank_accounts ba
-                LEFT JOIN banks b ON b.routing = ba.routing
-                WHERE ba.bank_account_id = %s
-                """,
+                _DSQL_ACCOUNT_SELECT + "    WHERE ba.bank_account_id = %s",
                 (account_id,),
             )
             return cur.fetchone()
 
 
 def _update_dsql_next_check(account_id: str, next_check_number: int) -> None:
-    import common_dsql
-
-    with common_dsql.connect_db() as conn:
+    with common_dsql.get_conn() as conn:
         with conn.cursor() as cur:
             cur.execute(
                 """
@@ -209,53 +299,186 @@ def _update_dsql_next_check(account_id: str, next_check_number: int) -> None:
 
 SETTINGS_DIR = Path(os.environ.get("SETTINGS_DIR", "data"))
 SETTINGS_FILE = SETTINGS_DIR / "settings.json"
-SETTINGS_NAME_RE = re.compile(r"^[A-Za-z0-9_-]{1,50}$")
+SETTINGS_NAME_RE = re.compile(r"[A-Za-z0-9_-]{1,50}", re.ASCII)
 
+# Parsed settings keyed by (st_mtime_ns, st_size) so hot endpoints skip the
+# disk read + JSON parse when settings.json has not changed. Guarded by a lock:
+# both the dev server and threaded WSGI workers serve requests concurrently.
+_SETTINGS_CACHE = {"key": None, "data": None, "sha256": None}
+_SETTINGS_LOCK = threading.Lock()
 
-def load_settings() -> dict:
-    if not SETTINGS_FILE.exists():
-        return {"presets": {}, "accounts": {}, "global": {}}
+# Serialized response bodies for single preset/account GETs, keyed by
+# (section, name) and dropped whenever the settings cache reloads.
+_RESPONSE_CACHE: dict[tuple[str, str], bytes] = {}
+
+
+def _parse_settings() -> Tuple[dict, str | None]:
+    """Parse settings.json; returns (settings, sha256-of-file or None)."""
     try:
-        data = json.loads(SETTINGS_FILE.read_text())
-    except json.JSONDecodeError:
-        return {"presets": {}, "accounts": {}, "global": {}}
+        with open(SETTINGS_FILE, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                sha = hashlib.sha256(mm).hexdigest()
+                # orjson parses straight from the mapped pages; no str/bytes copy.
+                data = orjson.loads(memoryview(mm))
+    except (OSError, ValueError):
+        # ValueError covers both empty files (mmap) and invalid JSON (orjson).
+        return {"presets": {}, "accounts": {}, "global": {}}, None
     if isinstance(data, dict) and ("presets" in data or "accounts" in data or "global" in data):
         return {
-            "presets": dict(data.get("presets", {})),
-            "accounts": dict(data.get("accounts", {})),
-            "global": dict(data.get("global", {})),
-        }
+            "presets": data.get("presets", {}),
+            "accounts": data.get("accounts", {}),
+            "global": data.get("global", {}),
+        }, sha
     if isinstance(data, dict):
-        return {"presets": dict(data), "accounts": {}, "global": {}}
-    return {"presets": {}, "accounts": {}, "global": {}}
+        return {"presets": data, "accounts": {}, "global": {}}, sha
+    return {"presets": {}, "accounts": {}, "global": {}}, sha
+
+
+def _settings_snapshot() -> dict:
+    """Refresh and return the shared parsed settings. Callers must not mutate."""
+    with _SETTINGS_LOCK:
+        try:
+            st = SETTINGS_FILE.stat()
+        except FileNotFoundError:
+            if _SETTINGS_CACHE["key"] is not None:
+                _SETTINGS_CACHE["key"] = None
+                _RESPONSE_CACHE.clear()
+            _SETTINGS_CACHE["data"] = {"presets": {}, "accounts": {}, "global": {}}
+            _SETTINGS_CACHE["sha256"] = None
+            return _SETTINGS_CACHE["data"]
+        key = (st.st_mtime_ns, st.st_size)
+        if key != _SETTINGS_CACHE["key"]:
+            _SETTINGS_CACHE["data"], _SETTINGS_CACHE["sha256"] = _parse_settings()
+            _SETTINGS_CACHE["key"] = key
+            _RESPONSE_CACHE.clear()
+        return _SETTINGS_CACHE["data"]
+
+
+def load_settings() -> dict:
+    # Handlers mutate nested dicts before saving, so hand out a copy.
+    return copy.deepcopy(_settings_snapshot())
+
+
+def _cached_entry_response(section: str, name: str, missing_error: str):
+    """Serve one preset/account from cached bytes, serializing at most once."""
+    settings = _settings_snapshot()
+    data = settings[section].get(name)
+    if data is None:
+        return jsonify({"error": missing_error}), 404
+    key = (section, name)
+    body = _RESPONSE_CACHE.get(key)
+    if body is None:
+        body = orjson.dumps({"name": name, "data": data})
+        with _SETTINGS_LOCK:
+            # Publish only if settings have not reloaded since the snapshot;
+            # storing after a concurrent save's clear() would pin stale bytes
+            # until the next write.
+            if _SETTINGS_CACHE["data"] is settings:
+                _RESPONSE_CACHE[key] = body
+    return Response(body, mimetype="application/json")
 
 
 def save_settings(settings: dict) -> None:
     SETTINGS_DIR.mkdir(parents=True, exist_ok=True)
-    temp_file = SETTINGS_FILE.with_suffix(".tmp")
     payload = {
         "presets": settings.get("presets", {}),
         "accounts": settings.get("accounts", {}),
         "global": settings.get("global", {}),
     }
-    temp_file.write_text(json.dumps(payload, indent=2, sort_keys=True))
-    temp_file.replace(SETTINGS_FILE)
+    data = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2)
+    # mkstemp in the same directory keeps os.replace a same-filesystem rename;
+    # the fsync makes the rename crash-safe.
+    fd, tmp_path = tempfile.mkstemp(dir=SETTINGS_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, SETTINGS_FILE)
+        # fsync the directory too, so the rename itself survives a crash.
+        dir_fd = os.open(SETTINGS_DIR, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    # Seed the cache with what was just written so the next read skips the
+    # re-parse entirely.
+    with _SETTINGS_LOCK:
+        try:
+            st = SETTINGS_FILE.stat()
+        except FileNotFoundError:
+            _SETTINGS_CACHE["key"] = None
+            _SETTINGS_CACHE["sha256"] = None
+        else:
+            _SETTINGS_CACHE["key"] = (st.st_mtime_ns, st.st_size)
+            _SETTINGS_CACHE["data"] = copy.deepcopy(payload)
+            _SETTINGS_CACHE["sha256"] = hashlib.sha256(data).hexdigest()
+        _RESPONSE_CACHE.clear()
+
+
+class StaleSettingsError(RuntimeError):
+    """Settings changed on disk since the caller's expected_prev_sha256 was read."""
+
+
+def _settings_sha256() -> str | None:
+    _settings_snapshot()
+    with _SETTINGS_LOCK:
+        return _SETTINGS_CACHE["sha256"]
+
+
+# Serializes whole read-modify-write cycles. _SETTINGS_LOCK only guards
+# individual cache operations; without this outer lock two threaded-worker
+# POSTs could interleave load/mutate/save and silently drop one update (or
+# seed the cache with one writer's payload against the other's stat()).
+_SETTINGS_MUTATE_LOCK = threading.Lock()
+
+
+def _mutate_settings(mutate, *, expected_prev_sha256: str | None = None) -> Tuple[dict, str | None]:
+    """Copy-on-write settings update; returns (settings, post-write sha256).
+
+    Applies `mutate` to a copy of the cached settings and persists the result;
+    thanks to the mtime cache and the save-path cache seeding, a mutation costs
+    one serialize + write with no disk re-read. The whole cycle — precondition
+    check included — runs under a mutation lock, so in-process writers cannot
+    interleave.
+
+    With expected_prev_sha256 this is an optimistic precondition: if the file
+    content hash no longer matches, nothing is written and StaleSettingsError
+    is raised, so concurrent writers cannot silently drop each other's updates.
+    """
+    with _SETTINGS_MUTATE_LOCK:
+        if expected_prev_sha256 is not None and expected_prev_sha256 != _settings_sha256():
+            raise StaleSettingsError("Settings changed since the client last read them.")
+        settings = load_settings()
+        mutate(settings)
+        save_settings(settings)
+        return settings, _settings_sha256()
 
 
 def parse_page_size(form: dict) -> Tuple[float, float]:
-    choice = form.get("page_size", "triple")
-    if choice in PAGE_SIZES:
-        return PAGE_SIZES[choice]
+    choice = form.get("page_size")
+    if choice is None:
+        return _DEFAULT_PAGE_SIZE
+    size = PAGE_SIZES.get(choice)
+    if size is not None:
+        return size
     width = float(form.get("custom_width", 8.5))
     height = float(form.get("custom_height", 11.0))
     return (width, height)
 
 
 def parse_int(value: str, default: int) -> int:
-    try:
+    # isdecimal check instead of try/except: skips CPython's exception setup
+    # cost on the hot form-parsing path.
+    if value is not None and value.removeprefix("-").isdecimal():
         return int(value)
-    except (TypeError, ValueError):
-        return default
+    return default
 
 
 @app.get("/api/settings")
@@ -266,11 +489,7 @@ def list_settings():
 
 @app.get("/api/settings/<name>")
 def get_setting(name: str):
-    settings = load_settings()
-    data = settings["presets"].get(name)
-    if data is None:
-        return jsonify({"error": "Preset not found."}), 404
-    return jsonify({"name": name, "data": data})
+    return _cached_entry_response("presets", name, "Preset not found.")
 
 
 @app.post("/api/settings")
@@ -278,29 +497,29 @@ def save_setting():
     payload = request.get_json(silent=True) or {}
     name = (payload.get("name") or "").strip()
     data = payload.get("data") or {}
-    if not SETTINGS_NAME_RE.match(name):
+    if not SETTINGS_NAME_RE.fullmatch(name):
         return jsonify({"error": "Preset name must be 1-50 characters (letters, numbers, _ or -)."}), 400
     if not isinstance(data, dict):
         return jsonify({"error": "Preset data must be a JSON object."}), 400
-    settings = load_settings()
-    settings["presets"][name] = data
-    save_settings(settings)
-    return jsonify({"status": "saved", "name": name})
+    try:
+        _, sha = _mutate_settings(
+            lambda s: s["presets"].__setitem__(name, data),
+            expected_prev_sha256=payload.get("expected_prev_sha256"),
+        )
+    except StaleSettingsError:
+        return jsonify({"error": "stale_precondition"}), 409
+    return jsonify({"status": "saved", "name": name, "sha256": sha})
 
 
 @app.get("/api/accounts")
 def list_accounts():
     settings = load_settings()
-    return jsonify({"accounts": sorted(settings["accounts"].keys())})
+    return _json_response({"accounts": sorted(settings["accounts"].keys())})
 
 
 @app.get("/api/accounts/<name>")
 def get_account(name: str):
-    settings = load_settings()
-    data = settings["accounts"].get(name)
-    if data is None:
-        return jsonify({"error": "Account not found."}), 404
-    return jsonify({"name": name, "data": data})
+    return _cached_entry_response("accounts", name, "Account not found.")
 
 
 @app.post("/api/accounts")
@@ -308,14 +527,18 @@ def save_account():
     payload = request.get_json(silent=True) or {}
     name = (payload.get("name") or "").strip()
     data = payload.get("data") or {}
-    if not SETTINGS_NAME_RE.match(name):
+    if not SETTINGS_NAME_RE.fullmatch(name):
         return jsonify({"error": "Account name must be 1-50 characters (letters, numbers, _ or -)."}), 400
     if not isinstance(data, dict):
         return jsonify({"error": "Account data must be a JSON object."}), 400
-    settings = load_settings()
-    settings["accounts"][name] = data
-    save_settings(settings)
-    return jsonify({"status": "saved", "name": name})
+    try:
+        _, sha = _mutate_settings(
+            lambda s: s["accounts"].__setitem__(name, data),
+            expected_prev_sha256=payload.get("expected_prev_sha256"),
+        )
+    except StaleSettingsError:
+        return jsonify({"error": "stale_precondition"}), 409
+    return jsonify({"status": "saved", "name": name, "sha256": sha})
 
 
 @app.post("/api/accounts/<name>/last-check")
@@ -327,13 +550,11 @@ def update_last_check(name: str):
         return jsonify({"error": "Last check number must be an integer."}), 400
     if last_check < 1:
         return jsonify({"error": "Last check number must be positive."}), 400
-    settings = load_settings()
-    account = settings["accounts"].get(name)
+    account = _settings_snapshot()["accounts"].get(name)
     if account is None:
         return jsonify({"error": "Account not found."}), 404
-    account["last_check_number"] = last_check
-    settings["accounts"][name] = account
-    save_settings(settings)
+    if account.get("last_check_number") != last_check:
+        _mutate_settings(lambda s: s["accounts"][name].__setitem__("last_check_number", last_check))
     return jsonify({"status": "updated", "name": name, "last_check_number": last_check})
 
 
@@ -346,35 +567,15 @@ def get_global_settings():
 @app.post("/api/global-settings")
 def save_global_settings():
     payload = request.get_json(silent=True) or {}
-    sso_url = (payload.get("sso_url") or "").strip()
-    if sso_url and not sso_url.startswith(("http://", "https://")):
+    fields = {key: (payload.get(key) or "").strip() for key in _GLOBAL_SETTING_KEYS}
+    fields["account_id"] = _RE_NON_DIGIT.sub("", fields["account_id"])
+    if fields["sso_url"] and not fields["sso_url"].startswith(("http://", "https://")):
         return jsonify({"error": "SSO URL must start with http:// or https://"}), 400
-    sso_region = (payload.get("sso_region") or "").strip()
-    account_id_raw = (payload.get("account_id") or "").strip()
-    account_id = re.sub(r"[^0-9]", "", account_id_raw)
-    role_name = (payload.get("role_name") or "").strip()
-    aws_region = (payload.get("aws_region") or "").strip()
-    db_name = (payload.get("db_name") or "").strip()
-    db_user = (payload.get("db_user") or "").strip()
-    tag_key = (payload.get("tag_key") or "").strip()
-    tag_value = (payload.get("tag_value") or "").strip()
-    if sso_region and not re.fullmatch(r"[a-z0-9-]+", sso_region):
-        return jsonify({"error": "SSO region must look like us-west-2."}), 400
-    if aws_region and not re.fullmatch(r"[a-z0-9-]+", aws_region):
-        return jsonify({"error": "AWS region must look like us-west-2."}), 400
-    if account_id and not re.fullmatch(r"\d{12}", account_id):
-        return jsonify({"error": "Account ID must be a 12-digit number."}), 400
-    settings = load_settings()
-    settings["global"]["sso_url"] = sso_url
-    settings["global"]["sso_region"] = sso_region
-    settings["global"]["account_id"] = account_id
-    settings["global"]["role_name"] = role_name
-    settings["global"]["aws_region"] = aws_region
-    settings["global"]["db_name"] = db_name
-    settings["global"]["db_user"] = db_user
-    settings["global"]["tag_key"] = tag_key
-    settings["global"]["tag_value"] = tag_value
-    save_settings(settings)
+    for key, pattern, error in _GLOBAL_FIELD_VALIDATORS:
+        value = fields[key]
+        if value and not pattern.fullmatch(value):
+            return jsonify({"error": error}), 400
+    settings, _ = _mutate_settings(lambda s: s["global"].update(fields))
     _sync_global_settings(settings)
     return jsonify({"status": "saved", "settings": settings["global"]})
 
@@ -411,8 +612,6 @@ def sso_device_start():
     if _sso_backend_requires_keyring() and not _keyring_available():
         return jsonify({"error": "Keyring is not available. Set SSO_CACHE_BACKEND=file."}), 400
     start_url = _resolve_start_url(settings, cfg)
-    import sso
-
     auth = sso.start_device_authorization(
         start_url=start_url,
         sso_region=cfg["SSO_REGION"],
@@ -440,15 +639,20 @@ def sso_device_poll():
     if _sso_backend_requires_keyring() and not _keyring_available():
         return jsonify({"error": "Keyring is not available. Set SSO_CACHE_BACKEND=file."}), 400
     start_url = _resolve_start_url(settings, cfg)
-    import sso
-
-    result = sso.poll_device_authorization(
-        start_url=start_url,
-        sso_region=cfg["SSO_REGION"],
-        account_id=cfg["ACCOUNT_ID"],
-        role_name=cfg["ROLE_NAME"],
-        device_code=device_code,
-    )
+    # One create_token attempt per client poll, in-request. The browser is the
+    # only poller, so across any number of gunicorn workers exactly one
+    # redeemer touches a given device code at a time; a background redeemer
+    # per worker would race to redeem the same code.
+    try:
+        result = sso.poll_device_authorization(
+            start_url=start_url,
+            sso_region=cfg["SSO_REGION"],
+            account_id=cfg["ACCOUNT_ID"],
+            role_name=cfg["ROLE_NAME"],
+            device_code=device_code,
+        )
+    except Exception as exc:  # surface AWS/client errors to the poller
+        return jsonify({"error": str(exc)}), 400
     if result["status"] in {"pending", "slow_down"}:
         return jsonify(result), 202
     if result["status"] != "authorized":
@@ -476,8 +680,8 @@ def list_dsql_accounts():
     start_url = _resolve_start_url(settings, cfg)
     if not _dsql_is_authenticated(start_url, cfg):
         return jsonify({"error": "SSO login required for DSQL access."}), 401
-    accounts = _fetch_dsql_accounts()
-    return jsonify({"accounts": accounts, "fields": DSQL_ACCOUNT_FIELDS})
+    rows = _fetch_dsql_accounts()
+    return _json_response({"fields": DSQL_ACCOUNT_FIELDS, "rows": rows})
 
 
 @app.post("/api/dsql/accounts/<account_id>/next-check")
@@ -547,29 +751,22 @@ def generate():
     checks_per_page = parse_int(form.get("checks_per_page", "1"), 1)
     position = parse_int(form.get("position", "1"), 1)
 
-    tmp_file = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
-    tmp_file.close()
-
-    @after_this_request
-    def cleanup(response):
-        try:
-            os.remove(tmp_file.name)
-        except FileNotFoundError:
-            pass
-        return response
-
-    create_check(
+    # Same pool as /generate-blank: rendering happens off the request thread
+    # and across CPUs instead of fighting the GIL.
+    pdf = _render_in_pool(
+        render_check,
         payee,
         amount,
         date,
         memo,
         position=position,
-        filename=tmp_file.name,
         checks_per_page=checks_per_page,
         page_size=page_size,
     )
 
-    return send_file(tmp_file.name, as_attachment=True, download_name="check.pdf")
+    return send_file(
+        io.BytesIO(pdf), mimetype="application/pdf", as_attachment=True, download_name="check.pdf"
+    )
 
 
 @app.post("/generate-blank")
@@ -614,22 +811,6 @@ def generate_blank():
     checks_per_page = parse_int(form.get("checks_per_page", "1"), 1)
     checks_per_page = max(1, min(checks_per_page, 3))
 
-    micr_file = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
-    micr_file.close()
-    nomicr_file = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
-    nomicr_file.close()
-    zip_file = tempfile.NamedTemporaryFile(suffix=".zip", delete=False)
-    zip_file.close()
-
-    @after_this_request
-    def cleanup(response):
-        for filename in (micr_file.name, nomicr_file.name, zip_file.name):
-            try:
-                os.remove(filename)
-            except FileNotFoundError:
-                pass
-        return response
-
     if account_source == "dsql":
         owner_name = "\n".join(
             filter(None, [account.get("company_name_1"), account.get("company_name_2")])
@@ -658,9 +839,11 @@ def generate_blank():
     micr_style = "B"
 
     try:
-        create_blank_check_pair(
-            micr_filename=micr_file.name,
-            nomicr_filename=nomicr_file.name,
+        # Render in a pool worker: keeps the request thread free and lets
+        # bulk runs use a second CPU instead of fighting the GIL. The worker
+        # returns the finished PDFs as bytes, so nothing touches disk.
+        micr_pdf, nomicr_pdf = _render_in_pool(
+            render_blank_check_pair,
             checks_per_page=checks_per_page,
             page_size=page_size,
             total_checks=total_checks,
@@ -677,12 +860,15 @@ def generate_blank():
     except RuntimeError as exc:
         return jsonify({"error": f"Unable to generate check PDFs: {exc}"}), 500
 
-    with zipfile.ZipFile(zip_file.name, "w") as archive:
-        archive.write(micr_file.name, arcname="micr.pdf")
-        archive.write(nomicr_file.name, arcname="nomicr.pdf")
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as archive:
+        archive.writestr("micr.pdf", micr_pdf)
+        archive.writestr("nomicr.pdf", nomicr_pdf)
+    buf.seek(0)
 
-    return send_file(zip_file.name, as_attachment=True, download_name="check_pdfs.zip")
+    return send_file(buf, mimetype="application/zip", as_attachment=True, download_name="check_pdfs.zip")
 
 
 if __name__ == "__main__":
+    # Dev convenience only; deployments use `gunicorn -c gunicorn.conf.py app:app`.
     app.run(host="0.0.0.0", port=8080)
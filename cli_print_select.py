@@ -7,49 +7,54 @@ def add_iota_info(pdf, check_number, routing_number, account_number, position=1)
     add_micr_line(pdf, check_number, routing_number, account_number, style='B', position=position)
     add_check_number(pdf, check_number, position=position)
 
-def select_bank_account():
-    with connect_db() as conn:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT bank_account_id, routing, account, name,
-                       company_name_1, company_name_2, company_address_1, company_address_2
-                FROM bank_accounts
-                ORDER BY name
-            """)
-            accounts = cur.fetchall()
-            print("\nAvailable Bank Accounts:\n")
-            print(tabulate(
-                [(i + 1, a['name'], a['routing'].strip(), a['account'].strip()) for i, a in enumerate(accounts)],
-                headers=["#", "Name", "Routing", "Account"]
-            ))
-
-            index = prompt_int("\nSelect a bank account by number", min=1, max=len(accounts)) - 1
-            selected = accounts[index]
-
-            cur.execute("SELECT * FROM banks WHERE routing = %s", (selected['routing'],))
-            bank = cur.fetchone()
-
-            cur.execute("""
-                SELECT next_check_number FROM bank_accounts
-                WHERE bank_account_id = %s
-                FOR UPDATE
-            """, (selected['bank_account_id'],))
-            next_check = cur.fetchone()['next_check_number']
+def select_bank_account(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT bank_account_id, routing, account, name,
+                   company_name_1, company_name_2, company_address_1, company_address_2
+            FROM bank_accounts
+            ORDER BY name
+        """)
+        accounts = cur.fetchall()
+        print("\nAvailable Bank Accounts:\n")
+        print(tabulate(
+            [(i + 1, a['name'], a['routing'].strip(), a['account'].strip()) for i, a in enumerate(accounts)],
+            headers=["#", "Name", "Routing", "Account"]
+        ))
+
+        index = prompt_int("\nSelect a bank account by number", min=1, max=len(accounts)) - 1
+        selected = accounts[index]
+
+        # One round trip instead of two: join the bank row onto the locked
+        # account row.
+        cur.execute("""
+            SELECT b.bank_name_1, b.bank_name_2, b.bank_address_1, b.bank_address_2,
+                   b.bank_fractional, ba.next_check_number
+            FROM bank_accounts ba
+            JOIN banks b ON b.routing = ba.routing
+            WHERE ba.bank_account_id = %s
+            FOR UPDATE OF ba
+        """, (selected['bank_account_id'],))
+        bank = cur.fetchone()
+        next_check = bank.pop('next_check_number')
 
     return selected, bank, next_check
 
-def update_next_check_number(bank_account_id, new_value):
-    with connect_db() as conn:
-        with conn.cursor() as cur:
-            cur.execute("""
-                UPDATE bank_accounts
-                SET next_check_number = %s
-                WHERE bank_account_id = %s
-            """, (new_value, bank_account_id))
-            conn.commit()
+def update_next_check_number(conn, bank_account_id, new_value):
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE bank_accounts
+            SET next_check_number = %s
+            WHERE bank_account_id = %s
+        """, (new_value, bank_account_id))
+        conn.commit()
 
 # Main
-selected, bank, next_check_number = select_bank_account()
+# One connection for the whole run: connect_db() is a TLS + IAM-token round
+# trip, and keeping the transaction open holds the FOR UPDATE row lock until
+# the user confirms (or declines) the print.
+conn = connect_db()
+selected, bank, next_check_number = select_bank_account(conn)
 
 routing_number = selected['routing'].strip()
 account_number = selected['account'].strip()
@@ -63,32 +68,41 @@ num_checks = prompt_int("Enter number of checks to print", default=1, min=1)
 
 start_index = first_position - 1
 
+# Loop invariants: these joins only depend on the selected account/bank.
+bank_name = "\n".join(filter(None, [bank.get("bank_name_1"), bank.get("bank_name_2")]))
+bank_address = "\n".join(filter(None, [bank.get("bank_address_1"), bank.get("bank_address_2")]))
+bank_fractional = bank.get("bank_fractional")
+owner_name = "\n".join(filter(None, [selected.get("company_name_1"), selected.get("company_name_2")]))
+owner_address = "\n".join(filter(None, [selected.get("company_address_1"), selected.get("company_address_2")]))
+
 # MICR and non-MICR PDFs with chosen page size / checks-per-page
 pdf_micr = PDF(checks_per_page=checks_per_page, page_size=page_size)
 pdf_nomicr = PDF(checks_per_page=checks_per_page, page_size=page_size)
 
+# Running page-slot counter (0-based) instead of a per-iteration modulo.
+slot = start_index
 for i in range(num_checks):
     check_number = first_check_number + i
-    absolute_position = start_index + i
-    position_on_page = (absolute_position % checks_per_page) + 1
-
-    if position_on_page == 1 and i > 0:
+    if slot == checks_per_page:
+        slot = 0
         pdf_micr.add_page()
         pdf_nomicr.add_page()
+    position_on_page = slot + 1
+    slot += 1
 
     add_iota_info(pdf_micr, check_number, routing_number, account_number, position=position_on_page)
 
     add_bank_info(
         pdf_nomicr,
-        bank_name="\n".join(filter(None, [bank.get("bank_name_1"), bank.get("bank_name_2")])),
-        bank_address="\n".join(filter(None, [bank.get("bank_address_1"), bank.get("bank_address_2")])),
-        fract_routing_num=bank.get("bank_fractional"),
+        bank_name=bank_name,
+        bank_address=bank_address,
+        fract_routing_num=bank_fractional,
         position=position_on_page
     )
     add_owner_info(
         pdf_nomicr,
-        owner_name="\n".join(filter(None, [selected.get("company_name_1"), selected.get("company_name_2")])),
-        owner_address="\n".join(filter(None, [selected.get("company_address_1"), selected.get("company_address_2")])),
+        owner_name=owner_name,
+        owner_address=owner_address,
         position=position_on_page
     )
     add_check_titles(pdf_nomicr, position=position_on_page)
@@ -99,8 +113,12 @@ pdf_micr.output("micr.pdf")
 print("MICR check info saved as micr.pdf")
 
 # Confirm before updating DB
-if prompt_yes_no("\nDid the checks print correctly?", default=False):
-    update_next_check_number(selected['bank_account_id'], first_check_number + num_checks)
-    print("Next check number updated in the database.")
-else:
-    print("Next check number not updated.")
+try:
+    if prompt_yes_no("\nDid the checks print correctly?", default=False):
+        update_next_check_number(conn, selected['bank_account_id'], first_check_number + num_checks)
+        print("Next check number updated in the database.")
+    else:
+        conn.rollback()
+        print("Next check number not updated.")
+finally:
+    conn.close()
@@ -1,7 +1,11 @@
 # common_dsql.py
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from typing import Iterable, Optional, Tuple
 import os
+import threading
 
 import configurations
 import dsql_auth
@@ -45,14 +49,19 @@ def _require(key: str) -> str:
         return v
     raise MissingSettingError(key, _config_path_str())
 
+# Resolved once at import; probed several times per token resolution.
+_DEBUG = os.environ.get("DSQL_DEBUG") not in (None, "", "0", "false", "False")
+
 def _is_debug() -> bool:
-    return os.environ.get("DSQL_DEBUG") not in (None, "", "0", "false", "False")
+    return _DEBUG
+
+_FALSY = frozenset(("0", "false", "no", ""))
 
 def _truthy_env(name: str, default: bool) -> bool:
     raw = os.environ.get(name)
     if raw is None:
         return default
-    return raw.strip().lower() not in ("0", "false", "no", "")
+    return raw.strip().lower() not in _FALSY
 
 def _cfg_namespace(account_id: Optional[str] = None, region: Optional[str] = None) -> str:
     """Namespace for cached items in config.json (ACCOUNT_ID:AWS_REGION)."""
@@ -61,10 +70,47 @@ def _cfg_namespace(account_id: Optional[str] = None, region: Optional[str] = Non
     return f"{aid}:{reg}"
 
 
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """One-pass snapshot of env + user config; missing keys stay None.
+
+    _require() re-reads os.environ and the config cache per key; a snapshot
+    resolves everything once and gets threaded through the call chain.
+    """
+
+    START_URL: Optional[str] = None
+    SSO_REGION: Optional[str] = None
+    ACCOUNT_ID: Optional[str] = None
+    ROLE_NAME: Optional[str] = None
+    AWS_REGION: Optional[str] = None
+    DB_NAME: Optional[str] = None
+    DB_USER: Optional[str] = None
+    TAG_KEY: Optional[str] = None
+    TAG_VALUE: Optional[str] = None
+
+    @classmethod
+    def load(cls) -> "Settings":
+        cfg = configurations.load_cfg()
+        values = {}
+        for key in _REQUIRED_KEYS:
+            v = os.environ.get(key)
+            if v in (None, ""):
+                v = cfg.get(key)
+            values[key] = v if isinstance(v, str) and v else None
+        return cls(**values)
+
+    def require(self, key: str) -> str:
+        value = getattr(self, key)
+        if not value:
+            raise MissingSettingError(key, _config_path_str())
+        return value
+
+
 def get_settings(keys: Optional[Iterable[str]] = None) -> dict[str, str]:
     """Return required DSQL settings or raise if any are missing."""
     needed = tuple(keys) if keys is not None else _REQUIRED_KEYS
-    return {key: _require(key) for key in needed}
+    settings = Settings.load()
+    return {key: settings.require(key) for key in needed}
 
 
 # ---------- tiny helpers ----------
@@ -76,18 +122,18 @@ def _load_cached_db_id(*, account_id: Optional[str] = None, region: Optional[str
     return cfg.get(_cfg_namespace(account_id, region), {}).get("db_id")
 
 def _save_cached_db_id(db_id: str, *, account_id: Optional[str] = None, region: Optional[str] = None) -> None:
-    cfg = configurations.load_cfg()
-    cfg.setdefault(_cfg_namespace(account_id, region), {})["db_id"] = db_id
-    configurations.save_cfg(cfg)
+    configurations.mutate_cfg(
+        lambda cfg: cfg.setdefault(_cfg_namespace(account_id, region), {}).__setitem__("db_id", db_id)
+    )
 
 def _best_effort_db_id(*, account_id: Optional[str] = None, region: Optional[str] = None) -> Optional[str]:
     return os.environ.get("DB_ID") or _load_cached_db_id(account_id=account_id, region=region)
 
-def _best_effort_db_host(*, region: str) -> Optional[str]:
+def _best_effort_db_host(*, region: str, account_id: Optional[str] = None) -> Optional[str]:
     env_host = os.environ.get("DB_HOST")
     if env_host:
         return env_host
-    dbid = _best_effort_db_id(region=region)
+    dbid = _best_effort_db_id(account_id=account_id, region=region)
     return _db_host_from_id(dbid, region) if dbid else None
 
 
@@ -98,34 +144,43 @@ def resolve_db_id_by_tag(
     region: Optional[str] = None,
     tag_key: Optional[str] = None,
     tag_value: Optional[str] = None,
+    settings: Optional[Settings] = None,
 ) -> str:
     """
     Scan Aurora DSQL clusters and return the single identifier
     whose tag matches key=value.
     """
-    region = region or _require("AWS_REGION")
-    tag_key = tag_key or _require("TAG_KEY")
-    tag_value = tag_value or _require("TAG_VALUE")
-
-    dsql_client = session.client("dsql", region_name=region)
-
-    clusters, token = [], None
-    while True:
-        page = dsql_client.list_clusters(**({"nextToken": token} if token else {}))
-        clusters.extend(page.get("clusters", []))
-        token = page.get("nextToken")
-        if not token:
-            break
-    if not clusters:
+    settings = settings or Settings.load()
+    region = region or settings.require("AWS_REGION")
+    tag_key = tag_key or settings.require("TAG_KEY")
+    tag_value = tag_value or settings.require("TAG_VALUE")
+
+    dsql_client = dsql_auth.dsql_client(session, region)
+
+    # The API has no server-side tag filter, so tags must be fetched per
+    # cluster; overlap the HTTPS round trips instead of paying them serially.
+    def _tags(c) -> dict:  # dict[str,str]
+        return dsql_client.list_tags_for_resource(resourceArn=c["arn"])["tags"]
+
+    # Paginate lazily and check tags page by page: tag lookups overlap with
+    # pagination and only one page of clusters is held at a time. Matches are
+    # still collected across ALL pages so the ambiguous-tag error below keeps
+    # its guarantee.
+    matches, seen_any = [], False
+    paginator = dsql_client.get_paginator("list_clusters")
+    with ThreadPoolExecutor(max_workers=16) as ex:
+        for page in paginator.paginate(PaginationConfig={"PageSize": 100}):
+            clusters = page.get("clusters", [])
+            if not clusters:
+                continue
+            seen_any = True
+            matches.extend(
+                c for c, tags in zip(clusters, ex.map(_tags, clusters))
+                if tags.get(tag_key) == tag_value
+            )
+    if not seen_any:
         raise RuntimeError("No Aurora DSQL clusters found in this account/region.")
 
-    matches = []
-    for c in clusters:
-        arn = c["arn"]
-        tags = dsql_client.list_tags_for_resource(resourceArn=arn)["tags"]  # dict[str,str]
-        if tags.get(tag_key) == tag_value:
-            matches.append(c)
-
     if not matches:
         raise RuntimeError(f"No DSQL cluster has tag {tag_key}={tag_value!r}.")
     if len(matches) > 1:
@@ -143,21 +198,30 @@ def sso_login_session(
     role_name: Optional[str] = None,
     aws_region: Optional[str] = None,
     open_browser: Optional[bool] = None,
+    settings: Optional[Settings] = None,
 ):
     """Thin wrapper around your sso.sso_login_and_get_session for consistency."""
     import sso
 
+    settings = settings or Settings.load()
     return sso.sso_login_and_get_session(
-        start_url=start_url or _require("START_URL"),
-        sso_region=sso_region or _require("SSO_REGION"),
-        account_id=account_id or _require("ACCOUNT_ID"),
-        role_name=role_name or _require("ROLE_NAME"),
-        aws_region=aws_region or _require("AWS_REGION"),
+        start_url=start_url or settings.require("START_URL"),
+        sso_region=sso_region or settings.require("SSO_REGION"),
+        account_id=account_id or settings.require("ACCOUNT_ID"),
+        role_name=role_name or settings.require("ROLE_NAME"),
+        aws_region=aws_region or settings.require("AWS_REGION"),
         # default: open browser unless explicitly disabled via env or arg
         open_browser=_truthy_env("SSO_OPEN_BROWSER", True) if open_browser is None else open_browser,
     )
 
 
+@dataclass(frozen=True, slots=True)
+class TokenResult:
+    token: str
+    host: str
+    db_id: Optional[str] = None
+
+
 def get_token_and_host(
     user: str,
     *,
@@ -166,15 +230,21 @@ def get_token_and_host(
     host_override: Optional[str] = None,
     dbid_override: Optional[str] = None,
     tag_override: Optional[Tuple[str, str]] = None,
-) -> Tuple[str, str]:
+    settings: Optional[Settings] = None,
+    populate_env: bool = False,
+) -> TokenResult:
     """
-    Returns (token, host). Respects env/overrides, cached token, and resolves by tag if needed.
+    Returns a TokenResult. Respects env/overrides, cached token, and resolves by tag if needed.
+
+    populate_env exports DB_TOKEN/DB_HOST/DB_ID for external scripts; in-process
+    callers use the returned fields directly.
     """
-    region = region or _require("AWS_REGION")
+    settings = settings or Settings.load()
+    region = region or settings.require("AWS_REGION")
 
     # Prefer explicit overrides/env
-    host = host_override or _best_effort_db_host(region=region)
-    dbid = dbid_override or _best_effort_db_id(region=region)
+    host = host_override or _best_effort_db_host(region=region, account_id=settings.ACCOUNT_ID)
+    dbid = dbid_override or _best_effort_db_id(account_id=settings.ACCOUNT_ID, region=region)
 
     # Try cached token first unless told to force refresh
     if host and not force_refresh:
@@ -182,12 +252,12 @@ def get_token_and_host(
         if cached:
             if _is_debug():
                 print("[DSQL] using cached token for", host, user, region)
-            return cached, host
+            return TokenResult(token=cached, host=host, db_id=dbid)
 
     # Need SSO either to resolve ID or mint fresh token
     if _is_debug():
         print("[DSQL] establishing SSO session")
-    session = sso_login_session(aws_region=region)
+    session = sso_login_session(aws_region=region, settings=settings)
 
     # Resolve DB id if unknown and we don't already have an explicit host
     if not dbid and not host:
@@ -196,9 +266,9 @@ def get_token_and_host(
         if tag_override:
             key, val = tag_override
         else:
-            key, val = _require("TAG_KEY"), _require("TAG_VALUE")
-        dbid = resolve_db_id_by_tag(session, region=region, tag_key=key, tag_value=val)
-        _save_cached_db_id(dbid, region=region)
+            key, val = settings.require("TAG_KEY"), settings.require("TAG_VALUE")
+        dbid = resolve_db_id_by_tag(session, region=region, tag_key=key, tag_value=val, settings=settings)
+        _save_cached_db_id(dbid, account_id=settings.ACCOUNT_ID, region=region)
 
     # Compute host if we still don't have one
     if not host:
@@ -207,13 +277,14 @@ def get_token_and_host(
     # Mint a fresh token via your helper (admin vs non-admin handled by username)
     token = dsql_auth.get_dsql_token(session, host, user, region)
 
-    # Best-effort set env for scripts that expect these later
-    os.environ["DB_TOKEN"] = token
-    os.environ["DB_HOST"] = host
-    if dbid:
-        os.environ["DB_ID"] = dbid
+    if populate_env:
+        # Best-effort set env for scripts that expect these later
+        os.environ["DB_TOKEN"] = token
+        os.environ["DB_HOST"] = host
+        if dbid:
+            os.environ["DB_ID"] = dbid
 
-    return token, host
+    return TokenResult(token=token, host=host, db_id=dbid)
 
 
 def get_cached_token_and_host(
@@ -246,6 +317,7 @@ def connect_db(
     region: Optional[str] = None,
     token: Optional[str] = None,
     host: Optional[str] = None,
+    settings: Optional[Settings] = None,
 ):
     """
     psycopg2 connection with RealDictCursor; mints/uses cached token as needed.
@@ -253,14 +325,18 @@ def connect_db(
     from psycopg2 import connect as _pg_connect
     from psycopg2.extras import RealDictCursor
 
-    dbname = dbname or _require("DB_NAME")
-    user = user or _require("DB_USER")
-    region = region or _require("AWS_REGION")
+    settings = settings or Settings.load()
+    dbname = dbname or settings.require("DB_NAME")
+    user = user or settings.require("DB_USER")
+    region = region or settings.require("AWS_REGION")
 
     token = token or os.environ.get("DB_TOKEN")
-    host = host or os.environ.get("DB_HOST") or _best_effort_db_host(region=region)
+    host = host or os.environ.get("DB_HOST") or _best_effort_db_host(
+        region=region, account_id=settings.ACCOUNT_ID
+    )
     if not token or not host:
-        token, host = get_token_and_host(user=user, region=region)
+        result = get_token_and_host(user=user, region=region, settings=settings)
+        token, host = result.token, result.host
 
     return _pg_connect(
         host=host,
@@ -270,3 +346,81 @@ def connect_db(
         sslmode="require",
         cursor_factory=RealDictCursor,
     )
+
+
+# ---------- connection pooling ----------
+_POOL = None
+_POOL_LOCK = threading.Lock()
+_POOL_MIN = int(os.environ.get("DSQL_POOL_MIN", "1"))
+_POOL_MAX = int(os.environ.get("DSQL_POOL_MAX", "10"))
+
+
+def _new_pool(*, force_refresh: bool = False):
+    from psycopg2.extras import RealDictCursor
+    from psycopg2.pool import ThreadedConnectionPool
+
+    settings = Settings.load()
+    dbname = settings.require("DB_NAME")
+    user = settings.require("DB_USER")
+    region = settings.require("AWS_REGION")
+    result = get_token_and_host(
+        user=user, region=region, force_refresh=force_refresh, settings=settings
+    )
+    token, host = result.token, result.host
+    return ThreadedConnectionPool(
+        _POOL_MIN,
+        _POOL_MAX,
+        host=host,
+        user=user,
+        password=token,
+        dbname=dbname,
+        sslmode="require",
+        cursor_factory=RealDictCursor,
+    )
+
+
+@contextmanager
+def get_conn():
+    """
+    Pooled psycopg2 connection. Avoids the per-request TLS + IAM-token cost of
+    connect_db(); if the pooled token expired, rebuilds the pool once with a
+    fresh token.
+    """
+    global _POOL
+    from psycopg2 import OperationalError
+
+    with _POOL_LOCK:
+        if _POOL is None or _POOL.closed:
+            _POOL = _new_pool()
+        pool = _POOL
+    try:
+        conn = pool.getconn()
+        if conn.closed:
+            # hand the dead connection back (closed) before retrying
+            try:
+                pool.putconn(conn, close=True)
+            except Exception:
+                pass
+            raise OperationalError("stale pooled connection")
+    except OperationalError:
+        # Token likely expired; swap in a pool built on a fresh token. The old
+        # pool is left open — closeall() would also kill connections other
+        # threads hold mid-query — and drains as its connections come back
+        # through the retired-pool putconn below.
+        with _POOL_LOCK:
+            if _POOL is pool:
+                _POOL = _new_pool(force_refresh=True)
+            pool = _POOL
+        conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        try:
+            if not conn.closed:
+                conn.rollback()  # never return a conn mid-transaction
+            with _POOL_LOCK:
+                retired = pool is not _POOL
+            # close=True on a retired pool drains it connection by connection.
+            pool.putconn(conn, close=retired or bool(conn.closed))
+        except Exception:
+            pass
@@ -1,12 +1,27 @@
 # configurations.py
 from pathlib import Path
-import json, os
+import copy, os, threading
 
 try:
     from platformdirs import user_config_dir
 except ModuleNotFoundError:
     user_config_dir = None
 
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+except ModuleNotFoundError:
+    import json
+
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, sort_keys=True).encode()
+
 _APP_NAME = "Checks"
 
 def _config_dir() -> Path:
@@ -18,6 +33,11 @@ def get_config_path() -> Path:
     """Public helper so other modules can show a friendly path in errors."""
     return _config_dir() / "config.json"
 
+# Parsed config keyed by (st_mtime_ns, st_size): token resolution hits
+# load_cfg() many times per call, so re-parse only when the file changed.
+_CACHE = {"key": None, "data": None}
+_CACHE_LOCK = threading.Lock()
+
 def load_cfg():
     cfg_path = get_config_path()
     cfg_path.parent.mkdir(parents=True, exist_ok=True)
@@ -32,19 +52,63 @@ def load_cfg():
             pass
 
     try:
-        txt = cfg_path.read_text(encoding="utf-8") or "{}"
-        return json.loads(txt)
-    except Exception:
-        # Corrupt file? return empty to keep callers resilient
+        st = cfg_path.stat()
+    except OSError:
         return {}
+    key = (st.st_mtime_ns, st.st_size)
+    with _CACHE_LOCK:
+        if key != _CACHE["key"]:
+            try:
+                _CACHE["data"] = _loads(cfg_path.read_bytes() or b"{}")
+            except Exception:
+                # Corrupt file? return empty to keep callers resilient
+                _CACHE["data"] = {}
+            _CACHE["key"] = key
+        # Callers mutate the result before save_cfg, so hand out a copy.
+        return copy.deepcopy(_CACHE["data"])
+
+# Serializes writers. Without it, two concurrent saves can interleave the
+# replace and the cache seeding, pairing one writer's cfg with the other's
+# stat(); held across whole read-modify-write cycles by mutate_cfg so
+# concurrent mutators cannot drop each other's updates either. RLock so
+# save_cfg can be called directly or from inside mutate_cfg.
+_MUTATE_LOCK = threading.RLock()
 
 def save_cfg(cfg: dict):
     cfg_path = get_config_path()
     cfg_path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = cfg_path.with_suffix(".json.tmp")
-    tmp.write_text(json.dumps(cfg, indent=2, sort_keys=True), encoding="utf-8")
-    tmp.replace(cfg_path)
-    try:
-        os.chmod(cfg_path, 0o600)
-    except Exception:
-        pass
+    with _MUTATE_LOCK:
+        tmp = cfg_path.with_suffix(".json.tmp")
+        tmp.write_bytes(_dumps(cfg))
+        tmp.replace(cfg_path)
+        try:
+            # chmod only when the mode actually drifted; saves a syscall per write.
+            if (os.stat(cfg_path).st_mode & 0o777) != 0o600:
+                os.chmod(cfg_path, 0o600)
+        except Exception:
+            pass
+        # Seed the cache with what was just written so the next load_cfg()
+        # skips the re-read entirely.
+        with _CACHE_LOCK:
+            try:
+                st = cfg_path.stat()
+            except OSError:
+                _CACHE["key"] = None
+            else:
+                _CACHE["key"] = (st.st_mtime_ns, st.st_size)
+                _CACHE["data"] = copy.deepcopy(cfg)
+
+def mutate_cfg(mutate):
+    """Serialized read-modify-write on the config file.
+
+    Applies `mutate` to the current config under the mutation lock and saves
+    the result, skipping the write entirely when the mutation was a no-op.
+    Returns the (possibly updated) config dict.
+    """
+    with _MUTATE_LOCK:
+        before = load_cfg()
+        cfg = copy.deepcopy(before)
+        mutate(cfg)
+        if cfg != before:
+            save_cfg(cfg)
+        return cfg
@@ -1,22 +1,43 @@
 # dsql_auth.py
-import json, time, os
+import json, sqlite3, threading, time, os
+from collections import OrderedDict
 from pathlib import Path
 
 import configurations
 
+__all__ = [
+    "load_cached_token",
+    "save_cached_token",
+    "clear_cached_token",
+    "get_dsql_token",
+]
+
 # ---- Tunables (env-overridable) ----
 TOKEN_TTL = int(os.getenv("DSQL_TOKEN_TTL", str(15 * 60)))  # seconds
 TOKEN_SAFETY = int(os.getenv("DSQL_TOKEN_SAFETY", "60"))    # refresh N sec early
 KEYRING_SERVICE = os.getenv("DSQL_KEYRING_SERVICE", "checks-app-dsql")
 CACHE_BACKEND = os.getenv("DSQL_CACHE_BACKEND", "auto").strip().lower()
-CACHE_FILE_NAME = os.getenv("DSQL_CACHE_FILENAME", "dsql_token_cache.json")
+CACHE_FILE_NAME = os.getenv("DSQL_CACHE_FILENAME", "dsql_token_cache.db")
 
 # Simple in-process cache so the app keeps working even if Keychain is fussy
 # { (host, user, region): {"token": "...", "exp": epoch_seconds} }
-_MEM_CACHE = {}
+# LRU-capped so long-running daemons touching many hosts don't creep.
+_MEM_CACHE: OrderedDict = OrderedDict()
+_MEM_CACHE_MAX = int(os.getenv("DSQL_MEM_CACHE_MAX", "256"))
+
+# Set after one successful set/get round trip; later saves trust set_password
+# and skip the extra keychain read (tens of ms per save on macOS).
+_keyring_trusted = False
+
+def _verify_keyring_writes() -> bool:
+    return os.getenv("DSQL_VERIFY_KEYRING") not in (None, "", "0", "false", "False")
+
+# Resolved once: the flag never changes mid-process and this gets probed on
+# every cache hit.
+_DEBUG = os.getenv("DSQL_DEBUG") not in (None, "", "0", "false", "False")
 
 def _debug() -> bool:
-    return os.getenv("DSQL_DEBUG") not in (None, "", "0", "false", "False")
+    return _DEBUG
 
 def _now() -> float:
     return time.time()
@@ -37,48 +58,85 @@ def _cache_path() -> Path:
     cfg_path = configurations.get_config_path()
     return cfg_path.with_name(CACHE_FILE_NAME)
 
-def _load_file_cache() -> dict:
-    path = _cache_path()
-    if not path.exists():
-        return {}
+# SQLite file cache: one upsert per token save instead of rewriting the
+# whole JSON dict; WAL keeps concurrent readers cheap and safe.
+_DB = None
+_DB_LOCK = threading.Lock()
+
+def _open_db() -> sqlite3.Connection:
+    global _DB
+    with _DB_LOCK:
+        if _DB is None:
+            path = _cache_path()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tokens (key TEXT PRIMARY KEY, token TEXT, exp REAL)"
+            )
+            conn.commit()
+            _DB = conn
+        return _DB
+
+def _db_get_token(key: str):
+    """Returns (token, exp) or None; swallows sqlite errors like the old cache."""
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        conn = _open_db()
+        with _DB_LOCK:
+            return conn.execute("SELECT token, exp FROM tokens WHERE key = ?", (key,)).fetchone()
     except Exception:
-        return {}
+        return None
 
-def _write_file_cache(data: dict) -> bool:
-    path = _cache_path()
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(".tmp")
+def _db_put_token(key: str, token: str, exp: float) -> bool:
     try:
-        tmp.write_text(json.dumps(data), encoding="utf-8")
-        tmp.replace(path)
+        conn = _open_db()
+        with _DB_LOCK:
+            conn.execute("INSERT OR REPLACE INTO tokens VALUES (?, ?, ?)", (key, token, exp))
+            conn.commit()
         return True
     except Exception:
         return False
 
+def _db_delete_token(key: str) -> None:
+    try:
+        conn = _open_db()
+        with _DB_LOCK:
+            conn.execute("DELETE FROM tokens WHERE key = ?", (key,))
+            conn.commit()
+    except Exception:
+        pass
+
 def _cache_use_keyring() -> bool:
     return CACHE_BACKEND in ("keyring", "auto")
 
 def _cache_use_file() -> bool:
     return CACHE_BACKEND in ("file", "auto")
 
+# (keyring module, KeyringError) — resolved once; the import itself triggers
+# backend discovery, which is not free on first call.
+_KR = None
+
 def _keyring_client():
-    import keyring
-    from keyring.errors import KeyringError
+    global _KR
+    if _KR is None:
+        import keyring
+        from keyring.errors import KeyringError
 
-    return keyring, KeyringError
+        _KR = (keyring, KeyringError)
+    return _KR
 
 def load_cached_token(host, db_user, region):
     k = (host, db_user, region)
 
     # 1) Memory cache
     m = _MEM_CACHE.get(k)
-    if m and _not_expired(m["exp"]):
-        if _debug():
-            print("[DSQL] mem cache hit", host, db_user, region)
-        return m["token"]
-    elif m and not _not_expired(m["exp"]):
+    if m:
+        if _not_expired(m["exp"]):
+            _MEM_CACHE.move_to_end(k)
+            if _debug():
+                print("[DSQL] mem cache hit", host, db_user, region)
+            return m["token"]
         # drop stale
         _MEM_CACHE.pop(k, None)
 
@@ -104,17 +162,21 @@ def load_cached_token(host, db_user, region):
 
     # 3) File cache
     if _cache_use_file():
-        payload = _load_file_cache().get(_token_key(host, db_user, region))
-        if isinstance(payload, dict) and _not_expired(payload.get("exp", 0)):
-            _MEM_CACHE[k] = {"token": payload["token"], "exp": payload["exp"]}
+        row = _db_get_token(_token_key(host, db_user, region))
+        if row and _not_expired(row[1] or 0):
+            _MEM_CACHE[k] = {"token": row[0], "exp": row[1]}
             if _debug():
                 print("[DSQL] file cache hit", host, db_user, region)
-            return payload["token"]
+            return row[0]
 
     return None
 
 def _save_mem(host, db_user, region, token):
-    _MEM_CACHE[(host, db_user, region)] = {"token": token, "exp": _now() + TOKEN_TTL}
+    k = (host, db_user, region)
+    _MEM_CACHE[k] = {"token": token, "exp": _now() + TOKEN_TTL}
+    _MEM_CACHE.move_to_end(k)
+    while len(_MEM_CACHE) > _MEM_CACHE_MAX:
+        _MEM_CACHE.popitem(last=False)
 
 def save_cached_token(host, db_user, region, token) -> bool:
     payload = {"token": token, "exp": _now() + TOKEN_TTL}
@@ -126,23 +188,25 @@ def save_cached_token(host, db_user, region, token) -> bool:
     key = _token_key(host, db_user, region)
     success = False
 
-    # write to Keychain with verification
+    # write to Keychain; round-trip verify only until the backend proves itself
     if _cache_use_keyring():
+        global _keyring_trusted
         keyring, KeyringError = _keyring_client()
         try:
             keyring.set_password(KEYRING_SERVICE, key, secret)  # None on success
-            roundtrip = keyring.get_password(KEYRING_SERVICE, key)
-            if roundtrip != secret:
-                raise KeyringError("Round-trip verification failed")
+            if not _keyring_trusted or _verify_keyring_writes():
+                roundtrip = keyring.get_password(KEYRING_SERVICE, key)
+                if roundtrip != secret:
+                    raise KeyringError("Round-trip verification failed")
+                _keyring_trusted = True
             success = True
         except KeyringError:
+            _keyring_trusted = False
             success = False
 
     # fall back to file cache
     if _cache_use_file():
-        data = _load_file_cache()
-        data[key] = payload
-        success = _write_file_cache(data) or success
+        success = _db_put_token(key, token, payload["exp"]) or success
 
     return success
 
@@ -157,10 +221,18 @@ def clear_cached_token(host, db_user, region):
         except KeyringError:
             pass
     if _cache_use_file():
-        data = _load_file_cache()
-        if key in data:
-            data.pop(key, None)
-            _write_file_cache(data)
+        _db_delete_token(key)
+
+def dsql_client(session, region):
+    """Per-session, per-region dsql client; construction costs tens of ms."""
+    cache = getattr(session, "_dsql_client_cache", None)
+    if cache is None:
+        cache = {}
+        session._dsql_client_cache = cache
+    client = cache.get(region)
+    if client is None:
+        client = cache[region] = session.client("dsql", region_name=region)
+    return client
 
 def get_dsql_token(session, host, db_user, region):
     # 1) Try caches
@@ -169,7 +241,7 @@ def get_dsql_token(session, host, db_user, region):
         return cached
 
     # 2) Mint new token via DSQL
-    dsql = session.client("dsql", region_name=region)
+    dsql = dsql_client(session, region)
     if str(db_user).lower() == "admin":
         token = dsql.generate_db_connect_admin_auth_token(Hostname=host, Region=region)
     else:
@@ -0,0 +1,15 @@
+# gunicorn.conf.py
+# Run with: gunicorn -c gunicorn.conf.py app:app
+import os
+
+bind = "0.0.0.0:8080"
+
+# Threaded workers: handlers are mostly I/O (settings reads, AWS calls) and
+# the CPU-bound PDF rendering already runs in the app's process pool.
+worker_class = "gthread"
+workers = 2 * (os.cpu_count() or 1) + 1
+threads = 4
+
+# Import the app once in the master so module-level work (compiled regexes,
+# PAGE_SIZES, the orjson provider) is shared with workers via copy-on-write.
+preload_app = True
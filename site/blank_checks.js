@@ -104,16 +104,20 @@ async function refreshAccounts() {
         }
         throw new Error(payload.error || "Failed to load DSQL accounts.");
       }
+      // The API ships columns once plus row arrays; rebuild objects here.
+      const accounts = payload.rows.map((row) =>
+        Object.fromEntries(payload.fields.map((field, index) => [field, row[index]]))
+      );
       dsqlAccounts = new Map(
-        payload.accounts.map((account) => [String(account.bank_account_id), account])
+        accounts.map((account) => [String(account.bank_account_id), account])
       );
-      payload.accounts.forEach((account) => {
+      accounts.forEach((account) => {
         const option = document.createElement("option");
         option.value = String(account.bank_account_id);
         option.textContent = account.name || `Account ${account.bank_account_id}`;
         accountSelect.appendChild(option);
       });
-      accountLoadButton.disabled = payload.accounts.length === 0;
+      accountLoadButton.disabled = accounts.length === 0;
       setStatus(dsqlStatus, "Loaded DSQL accounts.");
     } catch (error) {
       accountLoadButton.disabled = true;
@@ -1,13 +1,27 @@
 # sso.py
-import json, os, time, webbrowser
+import copy
+import functools
+import hashlib
+import json, os, threading, time, webbrowser
 from pathlib import Path
 from urllib.parse import quote_plus
 import boto3
-from botocore.session import get_session
-from botocore.credentials import Credentials
 
 import configurations
 
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ModuleNotFoundError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
 KEYRING_SERVICE = "checks-app-sso"
 SKEW = 60  # seconds of safety around expirations
 DEVICE_GRANT = "urn:ietf:params:oauth:grant-type:device_code"
@@ -18,6 +32,13 @@ SSO_CACHE_FILENAME = os.getenv("SSO_CACHE_FILENAME", "sso_cache.json")
 # populated at runtime by _register_client()
 _register_cache = None
 
+# Set after one successful set/get round trip; later saves trust set_password
+# and skip the extra keychain read.
+_keyring_trusted = False
+
+def _verify_keyring_writes() -> bool:
+    return os.getenv("SSO_VERIFY_KEYRING") not in (None, "", "0", "false", "False")
+
 def _is_invalid_client(e: Exception) -> bool:
     # botocore-style
     resp = getattr(e, "response", None)
@@ -50,11 +71,26 @@ def _ensure_client(oidc, cache, cache_key, force: bool = False):
     _register_cache = client
     return client
 
+# Client construction loads endpoint data and builds signers (tens of ms);
+# these clients are stateless, so share them per region.
+@functools.lru_cache(maxsize=8)
+def _oidc_client(sso_region):
+    return boto3.client("sso-oidc", region_name=sso_region)
+
+
+@functools.lru_cache(maxsize=8)
+def _sso_client(sso_region):
+    return boto3.client("sso", region_name=sso_region)
+
+
+_SSO_DEBUG = bool(os.getenv("SSO_DEBUG"))
+
 def _dbg(*a):
-    if os.getenv("SSO_DEBUG"):
+    if _SSO_DEBUG:
         print("[SSO]", *a)
 
 
+@functools.lru_cache(maxsize=64)
 def _norm_start_url(u: str) -> str:
     u = (u or "").strip()
     if u.endswith("/"):
@@ -62,6 +98,7 @@ def _norm_start_url(u: str) -> str:
     return u.lower()
 
 
+@functools.lru_cache(maxsize=128)
 def _cache_key(start_url, sso_region, account_id, role_name):
     return f"{_norm_start_url(start_url)}|{sso_region}|{account_id}|{role_name}"
 
@@ -81,36 +118,106 @@ def _cache_use_keyring() -> bool:
 def _cache_use_file() -> bool:
     return SSO_CACHE_BACKEND in ("file", "auto")
 
-def _load_file_cache() -> dict:
-    path = _cache_path()
+# The file cache is sharded per cache key so a token refresh rewrites one
+# small file instead of re-serializing every other entry. The legacy
+# all-in-one sso_cache.json is split into shards once, then renamed aside.
+_legacy_migrated = False
+
+def _shard_path(key: str) -> Path:
+    digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+    return _cache_path().parent / f"sso_cache_{digest}.json"
+
+def _migrate_legacy_file_cache() -> None:
+    global _legacy_migrated
+    if _legacy_migrated:
+        return
+    _legacy_migrated = True
+    legacy = _cache_path()
+    if not legacy.exists():
+        return
+    try:
+        data = _loads(legacy.read_bytes())
+        if isinstance(data, dict):
+            for key, entry in data.items():
+                if isinstance(entry, dict) and not _shard_path(key).exists():
+                    _write_shard(key, entry)
+        legacy.replace(legacy.with_suffix(".json.migrated"))
+    except Exception:
+        pass
+
+def _load_shard(key: str) -> dict:
+    _migrate_legacy_file_cache()
+    path = _shard_path(key)
     if not path.exists():
         return {}
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        data = _loads(path.read_bytes())
     except Exception:
         return {}
+    return data if isinstance(data, dict) else {}
 
-def _write_file_cache(data: dict) -> bool:
-    path = _cache_path()
+def _write_shard(key: str, data: dict) -> bool:
+    path = _shard_path(key)
     path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(".tmp")
     try:
-        tmp.write_text(json.dumps(data), encoding="utf-8")
-        tmp.replace(path)
+        payload = _dumps(data)
+        try:
+            # Nothing changed on disk: skip the tmp write + rename entirely.
+            if path.read_bytes() == payload:
+                return True
+        except OSError:
+            pass
+        # A shard holds a single entry and a torn write just means the next
+        # read falls back to {} and re-fetches, so write in place rather
+        # than paying a tmp write + rename per token refresh.
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            os.write(fd, payload)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
         return True
     except Exception:
         return False
 
 
+# (keyring module, errors module, resolved backend) — resolved once; backend
+# discovery walks the configured backend list and can be slow the first time.
+_KR = None
+
+
 def _keyring_client():
-    import keyring
-    import keyring.errors as ke
+    global _KR
+    if _KR is None:
+        import keyring
+        import keyring.errors as ke
+
+        _KR = (keyring, ke, keyring.get_keyring())
+    return _KR[0], _KR[1]
+
+
+def _keyring_backend():
+    _keyring_client()
+    return _KR[2]
 
-    return keyring, ke
+
+# Short-lived memo of parsed cache entries so status checks and poll loops
+# don't pay a keychain IPC (or file parse) per call; _save_cache refreshes it.
+_CACHE_MEM: dict[str, tuple[dict, float]] = {}
+_CACHE_MEM_TTL = 5  # seconds
+
+
+def _remember(key, data):
+    _CACHE_MEM[key] = (copy.deepcopy(data), time.monotonic())
+    return (key, data)
 
 
 def _load_cache(start_url, sso_region, account_id, role_name):
     key = _cache_key(start_url, sso_region, account_id, role_name)
+    entry = _CACHE_MEM.get(key)
+    if entry is not None and time.monotonic() - entry[1] < _CACHE_MEM_TTL:
+        # Callers mutate the dict before saving; never hand out the memo itself.
+        return (key, copy.deepcopy(entry[0]))
     if _cache_use_keyring():
         keyring, ke = _keyring_client()
         try:
@@ -120,32 +227,40 @@ def _load_cache(start_url, sso_region, account_id, role_name):
             raw = None
         _dbg("load_cache", key, "present:", bool(raw))
         if raw:
-            return (key, json.loads(raw))
+            return _remember(key, _loads(raw))
     if _cache_use_file():
-        data = _load_file_cache().get(key)
+        data = _load_shard(key)
         _dbg("load_cache file present:", bool(data))
-        if isinstance(data, dict):
-            return (key, data)
-    return (key, {})
+        if data:
+            return _remember(key, data)
+    return _remember(key, {})
 
 
 def _save_cache(cache_key, data):
-    payload = json.dumps(data)
+    # keyring stores str, so decode; orjson still wins on the encode itself
+    payload = _dumps(data).decode("utf-8")
     success = False
     if _cache_use_keyring():
+        global _keyring_trusted
         keyring, ke = _keyring_client()
         try:
             keyring.set_password(KEYRING_SERVICE, cache_key, payload)
-            if keyring.get_password(KEYRING_SERVICE, cache_key) != payload:
-                raise ke.KeyringError("Keychain round-trip verification failed")
+            if not _keyring_trusted or _verify_keyring_writes():
+                if keyring.get_password(KEYRING_SERVICE, cache_key) != payload:
+                    raise ke.KeyringError("Keychain round-trip verification failed")
+                _keyring_trusted = True
             _dbg("save_cache ok:", cache_key)
             success = True
         except ke.KeyringError as e:
-            _dbg("save_cache keyring FAILED:", e, "backend:", keyring.get_keyring())
+            _keyring_trusted = False
+            _dbg("save_cache keyring FAILED:", e, "backend:", _keyring_backend())
     if _cache_use_file():
-        file_cache = _load_file_cache()
-        file_cache[cache_key] = data
-        success = _write_file_cache(file_cache) or success
+        if _load_shard(cache_key) == data:
+            success = True
+        else:
+            success = _write_shard(cache_key, data) or success
+    if success:
+        _remember(cache_key, data)
     return success
 
 
@@ -172,13 +287,27 @@ def _create_token(oidc, *, client, grant_type, **kwargs):
 
 
 def _start_device_authorization(oidc, start_url):
+    # Callers normalize start_url once at their entry point.
     return oidc.start_device_authorization(
         clientId=_register_cache["clientId"],
         clientSecret=_register_cache.get("clientSecret"),
-        startUrl=_norm_start_url(start_url),
+        startUrl=start_url,
     )
 
 
+def _device_token_args(register_cache, device_code):
+    """Constant create_token kwargs for the device grant; built once so poll
+    loops don't rebuild the dict (or re-read the module global) per attempt."""
+    args = {
+        "clientId": register_cache["clientId"],
+        "grantType": DEVICE_GRANT,
+        "deviceCode": device_code,
+    }
+    if register_cache.get("clientSecret"):
+        args["clientSecret"] = register_cache["clientSecret"]
+    return args
+
+
 def _device_flow(oidc, start_url, open_browser=True, poll_timeout_sec=300):
     auth = _start_device_authorization(oidc, start_url)
     user_code = auth["userCode"]
@@ -187,7 +316,11 @@ def _device_flow(oidc, start_url, open_browser=True, poll_timeout_sec=300):
 
     if open_browser:
         try:
-            webbrowser.open(verif, new=2)  # new tab if possible
+            # Launching a browser can block for hundreds of ms; do it off-thread
+            # so polling starts immediately.
+            threading.Thread(
+                target=webbrowser.open, args=(verif,), kwargs={"new": 2}, daemon=True
+            ).start()
             print(f"Opening sign-in page: {verif}")
         except Exception:
             print(f"Open this URL to sign in: {verif}")
@@ -195,24 +328,26 @@ def _device_flow(oidc, start_url, open_browser=True, poll_timeout_sec=300):
         print(f"Open this URL to sign in: {verif}")
     print(f"Code: {user_code}")
 
+    # Server-advertised poll interval; SlowDown bumps it for the rest of the
+    # flow (capped) instead of backing off for a single sleep. monotonic()
+    # keeps the deadline immune to wall-clock jumps.
     interval = auth.get("interval", 5)
-    started = time.time()
+    deadline = time.monotonic() + poll_timeout_sec
+    token_args = _device_token_args(_register_cache, auth["deviceCode"])
     while True:
         try:
-            tok = _create_token(
-                oidc,
-                client=_register_cache,
-                grant_type=DEVICE_GRANT,
-                deviceCode=auth["deviceCode"],
-            )
+            tok = oidc.create_token(**token_args)
             _dbg("device_flow token keys:", list(tok.keys()))
             return tok
         except oidc.exceptions.AuthorizationPendingException:
-            if time.time() - started > poll_timeout_sec:
+            if time.monotonic() > deadline:
                 raise TimeoutError("SSO device authorization timed out.")
             time.sleep(interval)
         except oidc.exceptions.SlowDownException:
-            time.sleep(interval + 1)
+            interval = min(interval + 1, 10)
+            if time.monotonic() > deadline:
+                raise TimeoutError("SSO device authorization timed out.")
+            time.sleep(interval)
 
 
 def has_cached_access_token(start_url: str, sso_region: str, account_id: str, role_name: str) -> bool:
@@ -226,7 +361,7 @@ def has_cached_access_token(start_url: str, sso_region: str, account_id: str, ro
 
 def start_device_authorization(start_url: str, sso_region: str, account_id: str, role_name: str) -> dict:
     start_url = _norm_start_url(start_url)
-    oidc = boto3.client("sso-oidc", region_name=sso_region)
+    oidc = _oidc_client(sso_region)
     cache_key, cache = _load_cache(start_url, sso_region, account_id, role_name)
     _ensure_client(oidc, cache, cache_key)
     auth = _start_device_authorization(oidc, start_url)
@@ -249,16 +384,11 @@ def poll_device_authorization(
     device_code: str,
 ) -> dict:
     start_url = _norm_start_url(start_url)
-    oidc = boto3.client("sso-oidc", region_name=sso_region)
+    oidc = _oidc_client(sso_region)
     cache_key, cache = _load_cache(start_url, sso_region, account_id, role_name)
     _ensure_client(oidc, cache, cache_key)
     try:
-        token = _create_token(
-            oidc,
-            client=_register_cache,
-            grant_type=DEVICE_GRANT,
-            deviceCode=device_code,
-        )
+        token = oidc.create_token(**_device_token_args(_register_cache, device_code))
     except oidc.exceptions.AuthorizationPendingException:
         return {"status": "pending"}
     except oidc.exceptions.SlowDownException:
@@ -306,8 +436,8 @@ def sso_login_and_get_session(
       3) Else, do device flow (auto-opens browser by default)
     """
     start_url = _norm_start_url(start_url)
-    oidc = boto3.client("sso-oidc", region_name=sso_region)
-    sso = boto3.client("sso", region_name=sso_region)
+    oidc = _oidc_client(sso_region)
+    sso = _sso_client(sso_region)
 
     cache_key, cache = _load_cache(start_url, sso_region, account_id, role_name)
     _ensure_client(oidc, cache, cache_key)
@@ -371,6 +501,11 @@ def sso_login_and_get_session(
 
         _save_cache(cache_key, cache)
 
+    # Only this path needs botocore's session plumbing; keep it off the
+    # module-import cost for callers that just poll/check cached tokens.
+    from botocore.credentials import Credentials
+    from botocore.session import get_session
+
     role = sso.get_role_credentials(
         accessToken=access_token,
         accountId=account_id,
@@ -394,9 +529,9 @@ def debug_dump_cache(start_url, sso_region, account_id, role_name):
         keyring, _ = _keyring_client()
         raw = keyring.get_password(KEYRING_SERVICE, key)
         if raw:
-            data = json.loads(raw)
+            data = _loads(raw)
     if data is None and _cache_use_file():
-        data = _load_file_cache().get(key)
+        data = _load_shard(key) or None
     print("Key:", key)
     print("Backend:", "keyring" if _cache_use_keyring() else "file")
     print("Present:", bool(data))
@@ -1,8 +1,19 @@
+import functools
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal, InvalidOperation
+from io import BytesIO
 from fpdf import FPDF
 import inflect
 from pathlib import Path
 
+_CHECKS_DEBUG = bool(os.getenv("CHECKS_DEBUG"))
+
+def _udbg(*a):
+    if _CHECKS_DEBUG:
+        print(*a)
+
 top_y = 0.4375
 info_y = top_y + 0
 date_y = top_y + 0.55
@@ -20,7 +31,14 @@ REQUIRED_FONTS = {
     "MICR": FONT_DIR / "MICR.ttf",
 }
 
+# Font-set checks that already passed; the files don't vanish mid-process,
+# so each distinct `required` set only needs to stat the disk once.
+_FONTS_OK: set = set()
+
 def ensure_fonts_available(required=None):
+    key = frozenset(required if required is not None else REQUIRED_FONTS)
+    if key in _FONTS_OK:
+        return
     if not FONT_DIR.exists():
         raise RuntimeError(
             f"Missing fonts directory: {FONT_DIR}\n"
@@ -35,6 +53,7 @@ def ensure_fonts_available(required=None):
             f"Missing font file(s) in {FONT_DIR}: {missing_list}\n"
             f"Expected: {', '.join(str(p.name) for p in REQUIRED_FONTS.values())}"
         )
+    _FONTS_OK.add(key)
 
 class PDF(FPDF):
     def __init__(self, checks_per_page=3, page_size=(8.5, 11.0), orientation=None):
@@ -81,18 +100,18 @@ def add_owner_info(pdf, owner_name=None, owner_address=None, position=1):
 
     if owner_name:
         pdf.set_font("Arial", style='B', size=12)
+        line_height = pdf.font_size + 0.01
         for line in owner_name.splitlines():
-            width = get_string_length(pdf, line)
             add_text(pdf, x_offset, y_offset, line)
-            y_offset += pdf.font_size + 0.01
+            y_offset += line_height
         y_offset += 0.01
 
     if owner_address:
         pdf.set_font("Arial", style='', size=12)
+        line_height = pdf.font_size + 0.01
         for line in owner_address.splitlines():
-            width = get_string_length(pdf, line)
             add_text(pdf, x_offset, y_offset, line)
-            y_offset += pdf.font_size + 0.01
+            y_offset += line_height
         y_offset += 0.01
 
 def add_bank_info(pdf, bank_name=None, bank_address=None, fract_routing_num=None, position=1):
@@ -102,28 +121,53 @@ def add_bank_info(pdf, bank_name=None, bank_address=None, fract_routing_num=None
 
     if bank_name:
         pdf.set_font("Arial", style='B', size=11)
+        line_height = pdf.font_size + 0.01
         for line in bank_name.splitlines():
             width = get_string_length(pdf, line)
             add_text(pdf, x_center - width/2, y_offset, line)
-            y_offset += pdf.font_size + 0.01
+            y_offset += line_height
 
     if bank_address:
         pdf.set_font("Arial", size=9)
+        line_height = pdf.font_size + 0.01
         for line in bank_address.splitlines():
             width = get_string_length(pdf, line)
             add_text(pdf, x_center - width/2, y_offset, line)
-            y_offset += pdf.font_size + 0.01
+            y_offset += line_height
         y_offset += 0.02
 
     if fract_routing_num:
         width = get_string_length(pdf, fract_routing_num)
         add_text(pdf, x_center - width/2, y_offset, fract_routing_num)
 
+def _ensure_font(pdf, name):
+    """Register a TTF with this PDF once; add_font re-parses the file per call.
+
+    Registration stays lazy so filled checks (built-in Arial only) keep
+    rendering when the font files are absent.
+    """
+    loaded = getattr(pdf, "_loaded_fonts", None)
+    if loaded is None:
+        loaded = pdf._loaded_fonts = set()
+    if name not in loaded:
+        ensure_fonts_available([name])
+        pdf.add_font(name, '', str(REQUIRED_FONTS[name]), uni=True)
+        loaded.add(name)
+
+# Both strings are always measured in AvenirBook/10, so their widths are
+# process-wide constants; measure once instead of per check position.
+_TITLE_WIDTHS: dict = {}
+
+def _title_width(pdf, line):
+    width = _TITLE_WIDTHS.get(line)
+    if width is None:
+        width = _TITLE_WIDTHS[line] = get_string_length(pdf, line)
+    return width
+
 def add_check_titles(pdf, position=1):
-    ensure_fonts_available(["AvenirBook"])
+    _ensure_font(pdf, "AvenirBook")
     position = position - 1
     y_offset = 3.5 * position
-    pdf.add_font('AvenirBook', '', str(REQUIRED_FONTS["AvenirBook"]), uni=True)
     pdf.set_font("AvenirBook", style='', size=10)
     add_text(pdf, left_x, y_offset + payee_y - pdf.font_size, "PAY TO THE")
     add_text(pdf, left_x, y_offset + payee_y, "ORDER OF")
@@ -135,29 +179,52 @@ def add_check_titles(pdf, position=1):
     add_text(pdf, left_x, y_offset + memo_y, "MEMO")
 
     line = "_________________________________________________"
-    width = get_string_length(pdf, line)
+    width = _title_width(pdf, line)
     add_text(pdf, 6.5 - width/2, y_offset + bottom_y - pdf.font_size, line)
     line = "AUTHORIZED SIGNATURE"
-    width = get_string_length(pdf, line)
+    width = _title_width(pdf, line)
     add_text(pdf, 6.5 - width/2, y_offset + bottom_y, line)
     add_text(pdf, 6.25, y_offset + date_y, "DATE")
 
     pdf.set_font("AvenirBook", style='', size=12)
     add_text(pdf, 6.7, y_offset + payee_y, "$")
 
-def number_to_words(amount):
-    p = inflect.engine()
-    try:
-        normalized_amount = Decimal(str(amount)).quantize(Decimal("0.01"))
-    except (InvalidOperation, ValueError, TypeError) as exc:
-        raise ValueError(f"Invalid amount for number_to_words: {amount!r}") from exc
-    dollars, cents = f"{normalized_amount:.2f}".split(".")
-    dollar_words = p.number_to_words(int(dollars))
+# inflect.engine() loads large word tables; build it once and reuse it.
+_INFLECT = None
+
+def _engine():
+    global _INFLECT
+    if _INFLECT is None:
+        _INFLECT = inflect.engine()
+    return _INFLECT
+
+@functools.lru_cache(maxsize=1024)
+def _words_for(normalized: str) -> str:
+    dollars, cents = normalized.split(".")
+    dollar_words = _engine().number_to_words(int(dollars))
     if "and" in dollar_words:
         dollar_words = dollar_words.replace(" and", "")
     cents_words = f"{cents}/100"
     return f"{dollar_words} and {cents_words}"
 
+_CENTS = Decimal("0.01")
+
+def number_to_words(amount):
+    try:
+        if isinstance(amount, (int, Decimal)) and not isinstance(amount, bool):
+            # already exact; skip the str() round trip floats need
+            normalized_amount = Decimal(amount).quantize(_CENTS)
+        else:
+            normalized_amount = Decimal(str(amount)).quantize(_CENTS)
+    except (InvalidOperation, ValueError, TypeError) as exc:
+        raise ValueError(f"Invalid amount for number_to_words: {amount!r}") from exc
+    # Memoized on the quantized string so "5", 5 and 5.00 share one entry.
+    return _words_for(f"{normalized_amount:.2f}")
+
+# Capitalizes each word (including hyphenated parts) in one pass; the sole
+# literal "and" joining dollars to cents is restored afterwards.
+_TITLECASE_RE = re.compile(r"[A-Za-z]+")
+
 def add_check_info(pdf, payee=None, amount=None, date=None, memo=None, position=1):
     position = position - 1
     y_offset = 3.5 * position
@@ -176,16 +243,10 @@ def add_check_info(pdf, payee=None, amount=None, date=None, memo=None, position=
 
     if amount:
         formatted_amount = "**" + "{:,.2f}".format(float(amount))
-        amount_in_words_list = []
-        for word in number_to_words(amount).replace(',', '').split():
-            if '-' in word:
-                compound_word = '-'.join(part.capitalize() for part in word.split('-'))
-                amount_in_words_list.append(compound_word)
-            elif word != "and":
-                amount_in_words_list.append(word.capitalize())
-            else:
-                amount_in_words_list.append(word)
-        amount_in_words = ' '.join(amount_in_words_list) + " "
+        words = number_to_words(amount).replace(',', '')
+        amount_in_words = _TITLECASE_RE.sub(
+            lambda m: m.group(0).capitalize(), words
+        ).replace(" And ", " and ") + " "
 
         words_width = get_string_length(pdf, amount_in_words)
         asterisk_width = get_string_length(pdf, "*")
@@ -206,12 +267,9 @@ def add_check_info(pdf, payee=None, amount=None, date=None, memo=None, position=
         add_text(pdf, *amount_words_coords, txt=amount_in_words_with_asterisks)
 
 def add_micr_line(pdf, check_number, routing_number, account_number, style="A", position=1):
-    ensure_fonts_available(["MICR"])
-    pdf.add_font('MICR', '', str(REQUIRED_FONTS["MICR"]), uni=True)
+    _ensure_font(pdf, "MICR")
     pdf.set_font("MICR", size=10.089686098654708)
-    print(pdf.w)
-    print(pdf.h)
-    print(pdf.page_size)
+    _udbg("pdf dims:", pdf.w, pdf.h, pdf.page_size)
     page_width = pdf.w
     check_width = pdf.page_size[0]
     position = position - 1
@@ -227,13 +285,15 @@ def add_micr_line(pdf, check_number, routing_number, account_number, style="A",
         formatted_check_number = f"{check_number:06}"
 
     routing_info = f"T{routing_number}T"
-    text_width = get_string_length(pdf, routing_info)
-    micr_x = check_width - text_width - 0.3125 - (32 * 0.125) + x_correction
+    routing_width = get_string_length(pdf, routing_info)
+    micr_x = check_width - routing_width - 0.3125 - (32 * 0.125) + x_correction
     add_text(pdf, micr_x, micr_y, routing_info)
 
+    # The account group is anchored off the routing width (positions are
+    # fixed MICR columns, not the account string's own width), so reuse the
+    # measurement instead of re-measuring the same string.
     account_number_info = f" {account_number}O"
-    text_width = get_string_length(pdf, routing_info)
-    micr_x = check_width - text_width - 0.3125 - (19 * 0.125) + x_correction
+    micr_x = check_width - routing_width - 0.3125 - (19 * 0.125) + x_correction
     add_text(pdf, micr_x, micr_y, account_number_info)
 
     if 'S' == style:
@@ -260,11 +320,30 @@ def add_check_number(pdf, check_number, position=1):
     check_number_width = get_string_length(pdf, check_str)
     add_text(pdf, check_number_x - check_number_width, check_number_y, check_str)
 
+def output_pdf(pdf, destination):
+    """Write a finished PDF to a filesystem path or a binary file-like object."""
+    if hasattr(destination, "write"):
+        data = pdf.output(dest="S")
+        if isinstance(data, str):
+            data = data.encode("latin-1")
+        destination.write(data)
+    else:
+        pdf.output(destination)
+
 def create_check(payee, amount, date, memo, position=1, filename="check.pdf",
                  checks_per_page=3, page_size=(8.5, 11.0)):
     pdf = PDF(checks_per_page=checks_per_page, page_size=page_size)
     add_check_info(pdf, payee, amount, date, memo, position=position)
-    pdf.output(filename)
+    output_pdf(pdf, filename)
+
+
+def render_check(payee, amount, date, memo, position=1,
+                 checks_per_page=3, page_size=(8.5, 11.0)) -> bytes:
+    """Render a single filled check and return the PDF bytes."""
+    buf = BytesIO()
+    create_check(payee, amount, date, memo, position=position, filename=buf,
+                 checks_per_page=checks_per_page, page_size=page_size)
+    return buf.getvalue()
 
 
 def add_check_titles_safe(pdf, position=1):
@@ -288,6 +367,25 @@ def add_micr_line_safe(pdf, check_number, routing_number, account_number, style=
         raise RuntimeError(f"Unable to render MICR line: {exc}") from exc
 
 
+def _capture_stream(pdf, draw):
+    """Run draw() and return the content-stream text it appended to the page."""
+    before = len(pdf.pages[pdf.page])
+    draw()
+    return pdf.pages[pdf.page][before:]
+
+
+def _stamp_stream(pdf, stream, dy=0.0):
+    """Replay a captured content stream shifted down the page by dy inches.
+
+    The titles/owner/bank group is identical at every check position except
+    for the vertical offset, so emitting it once and stamping translated
+    copies avoids re-measuring and re-encoding the same text per check.
+    """
+    pdf._out(f"q 1 0 0 1 0 {-dy * pdf.k:.2f} cm")
+    pdf._out(stream)
+    pdf._out("Q")
+
+
 def create_blank_checks(
     *,
     filename: str,
@@ -305,19 +403,27 @@ def create_blank_checks(
     micr_style: str = "A",
 ) -> None:
     pdf = PDF(checks_per_page=checks_per_page, page_size=page_size)
-    for idx in range(total_checks):
-        if idx and idx % checks_per_page == 0:
-            pdf.add_page()
-        position = (idx % checks_per_page) + 1
-        add_check_titles_safe(pdf, position=position)
-        add_owner_info(pdf, owner_name=owner_name, owner_address=owner_address, position=position)
+
+    def _draw_shared():
+        add_check_titles_safe(pdf, position=1)
+        add_owner_info(pdf, owner_name=owner_name, owner_address=owner_address, position=1)
         add_bank_info(
             pdf,
             bank_name=bank_name,
             bank_address=bank_address,
             fract_routing_num=fractional_routing,
-            position=position,
+            position=1,
         )
+
+    shared = None
+    for idx in range(total_checks):
+        if idx and idx % checks_per_page == 0:
+            pdf.add_page()
+        position = (idx % checks_per_page) + 1
+        if shared is None:
+            shared = _capture_stream(pdf, _draw_shared)
+        else:
+            _stamp_stream(pdf, shared, dy=3.5 * (position - 1))
         check_number = first_check_number + idx
         add_check_number(pdf, check_number, position=position)
         if routing_number and account_number:
@@ -329,13 +435,11 @@ def create_blank_checks(
                 style=micr_style,
                 position=position,
             )
-    pdf.output(filename)
+    output_pdf(pdf, filename)
 
 
-def create_blank_check_pair(
+def _build_blank_check_pair(
     *,
-    micr_filename: str,
-    nomicr_filename: str,
     checks_per_page: int,
     page_size: tuple[float, float],
     total_checks: int,
@@ -348,33 +452,69 @@ def create_blank_check_pair(
     routing_number: str | None = None,
     account_number: str | None = None,
     micr_style: str = "B",
-) -> None:
+) -> tuple[PDF, PDF]:
     pdf_micr = PDF(checks_per_page=checks_per_page, page_size=page_size)
     pdf_nomicr = PDF(checks_per_page=checks_per_page, page_size=page_size)
-    for idx in range(total_checks):
-        if idx and idx % checks_per_page == 0:
-            pdf_micr.add_page()
-            pdf_nomicr.add_page()
-        position = (idx % checks_per_page) + 1
-        check_number = first_check_number + idx
-        add_check_number(pdf_micr, check_number, position=position)
-        if routing_number and account_number:
-            add_micr_line_safe(
-                pdf_micr,
-                check_number=check_number,
-                routing_number=routing_number,
-                account_number=account_number,
-                style=micr_style,
-                position=position,
+
+    def _render_micr():
+        for idx in range(total_checks):
+            if idx and idx % checks_per_page == 0:
+                pdf_micr.add_page()
+            position = (idx % checks_per_page) + 1
+            check_number = first_check_number + idx
+            add_check_number(pdf_micr, check_number, position=position)
+            if routing_number and account_number:
+                add_micr_line_safe(
+                    pdf_micr,
+                    check_number=check_number,
+                    routing_number=routing_number,
+                    account_number=account_number,
+                    style=micr_style,
+                    position=position,
+                )
+
+    def _render_nomicr():
+        def _draw_shared():
+            add_check_titles_safe(pdf_nomicr, position=1)
+            add_owner_info(pdf_nomicr, owner_name=owner_name, owner_address=owner_address, position=1)
+            add_bank_info(
+                pdf_nomicr,
+                bank_name=bank_name,
+                bank_address=bank_address,
+                fract_routing_num=fractional_routing,
+                position=1,
             )
-        add_check_titles_safe(pdf_nomicr, position=position)
-        add_owner_info(pdf_nomicr, owner_name=owner_name, owner_address=owner_address, position=position)
-        add_bank_info(
-            pdf_nomicr,
-            bank_name=bank_name,
-            bank_address=bank_address,
-            fract_routing_num=fractional_routing,
-            position=position,
-        )
-    pdf_micr.output(micr_filename)
-    pdf_nomicr.output(nomicr_filename)
+
+        shared = None
+        for idx in range(total_checks):
+            if idx and idx % checks_per_page == 0:
+                pdf_nomicr.add_page()
+            position = (idx % checks_per_page) + 1
+            if shared is None:
+                shared = _capture_stream(pdf_nomicr, _draw_shared)
+            else:
+                _stamp_stream(pdf_nomicr, shared, dy=3.5 * (position - 1))
+
+    # Two independent FPDF instances: safe to build in parallel as long as
+    # neither thread touches the other's document.
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        micr_future = ex.submit(_render_micr)
+        nomicr_future = ex.submit(_render_nomicr)
+        micr_future.result()
+        nomicr_future.result()
+    return pdf_micr, pdf_nomicr
+
+
+def create_blank_check_pair(*, micr_filename, nomicr_filename, **kwargs) -> None:
+    pdf_micr, pdf_nomicr = _build_blank_check_pair(**kwargs)
+    output_pdf(pdf_micr, micr_filename)
+    output_pdf(pdf_nomicr, nomicr_filename)
+
+
+def render_blank_check_pair(**kwargs) -> tuple[bytes, bytes]:
+    """Render the micr/nomicr pair to bytes; picklable, so pool-friendly."""
+    pdf_micr, pdf_nomicr = _build_blank_check_pair(**kwargs)
+    micr_buf, nomicr_buf = BytesIO(), BytesIO()
+    output_pdf(pdf_micr, micr_buf)
+    output_pdf(pdf_nomicr, nomicr_buf)
+    return micr_buf.getvalue(), nomicr_buf.getvalue()